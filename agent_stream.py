@@ -0,0 +1,99 @@
+"""
+Agent Streaming Helpers
+
+Shared run loop for the MCP and direct agents: streams the agent graph's
+node updates and stops as soon as the report has been written, so no
+further model turns are paid for once the task is done. Also holds the log
+banner helpers both analysis scripts use.
+"""
+
+import logging
+from typing import Any, Dict
+from contextlib import aclosing
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+# Banner rules for the analysis scripts' log output
+BANNER = "=" * 70
+RULE = "-" * 70
+
+
+def log_banner(log: logging.Logger, title: str) -> None:
+    """Log a title framed by banner rules as a single log record."""
+    log.info("%s\n%s\n%s", BANNER, title, BANNER)
+
+
+def log_response(log: logging.Logger, output: str) -> None:
+    """Log the agent's final output between rules as a single log record."""
+    log.info("Agent Response:\n%s\n%s\n%s", RULE, output, RULE)
+
+
+def content_text(content) -> str:
+    """Flatten ToolMessage / TextContent payloads into one string."""
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict):
+            parts.append(part.get("text", ""))
+        else:
+            parts.append(getattr(part, "text", ""))
+    return "".join(parts)
+
+
+def is_successful_write(message) -> bool:
+    """
+    Check whether a message is a write_file tool result without errors.
+    
+    Failures are signalled structurally: both tool sets raise ToolException
+    (MCP via isError=True results), which LangChain turns into a ToolMessage
+    with status="error".
+    """
+    return (
+        isinstance(message, ToolMessage)
+        and message.name == "write_file"
+        and message.status != "error"
+    )
+
+
+async def stream_until_written(agent, query: str) -> Dict[str, Any]:
+    """
+    Run an agent graph on a query, stopping right after a successful write.
+    
+    The stream is closed as soon as a write_file call succeeds, before the
+    model is asked for another turn. The output is then the write_file
+    result; otherwise it is the content of the final message.
+    
+    Args:
+        agent: Compiled agent graph (from langchain.agents.create_agent)
+        query: Question or task for the agent
+    
+    Returns:
+        Dictionary with 'output' and the full 'messages' list
+    """
+    messages = [HumanMessage(content=query)]
+    output = None
+    
+    # Stream node updates so we can stop as soon as the task is done
+    stream = agent.astream({"messages": messages}, stream_mode="updates")
+    async with aclosing(stream):
+        async for update in stream:
+            for node_update in update.values():
+                for message in (node_update or {}).get("messages", []):
+                    messages.append(message)
+                    if output is None and is_successful_write(message):
+                        output = content_text(message.content)
+            
+            # Report saved: skip the model's closing turn
+            if output is not None:
+                logger.info("write_file completed, stopping agent early")
+                break
+    
+    if output is None:
+        output = content_text(messages[-1].content)
+    
+    return {"output": output, "messages": messages}
@@ -10,35 +10,79 @@ This module handles:
 
 import os
 import sys
+import atexit
 import logging
+import time
+import hashlib
+import functools
+from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file (if exists)
-load_dotenv()
+
+@functools.cache
+def _load_env() -> dict:
+    """
+    Load environment variables from .env file (if exists) exactly once.
+    
+    Returns:
+        Snapshot of the environment values the configuration depends on
+    """
+    load_dotenv()
+    return {
+        key: os.environ.get(key)
+        for key in (
+            "OPENAI_API_KEY", "LOG_LEVEL", "SKIP_API_VALIDATION", "SKIP_RESPONSE_CACHE"
+        )
+    }
 
 
 class Config:
     """Central configuration management."""
     
     # API Keys - loaded from environment
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    OPENAI_API_KEY: Optional[str] = _load_env()["OPENAI_API_KEY"]
     
     # Project paths
     PROJECT_ROOT: str = os.path.dirname(os.path.abspath(__file__))
     DOCUMENTS_DIR: str = PROJECT_ROOT
+    DOCUMENTS_DIR_PATH: Path = Path(DOCUMENTS_DIR).resolve()
     
     # LLM Configuration
     LLM_MODEL: str = "gpt-4o-mini"  # Cost-effective, reliable
     LLM_TEMPERATURE: float = 0.0  # Deterministic for production
     LLM_MAX_TOKENS: int = 4096
     
+    # HTTP connection pool shared by all OpenAI / LangChain clients
+    HTTP_MAX_CONNECTIONS: int = 32
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    HTTP_TIMEOUT: float = 60.0
+    
+    # Per-user cache directory (validation stamp, response cache)
+    CACHE_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "w3d5")
+    
+    # API validation: skip entirely, or reuse a recent successful check
+    SKIP_API_VALIDATION: bool = _load_env()["SKIP_API_VALIDATION"] == "1"
+    API_VALIDATION_TTL: int = 3600  # seconds
+    API_VALIDATION_STAMP: str = os.path.join(CACHE_DIR, "validated")
+    
+    # Response cache for repeated document analysis runs (bypassed entirely
+    # with SKIP_RESPONSE_CACHE=1)
+    SKIP_RESPONSE_CACHE: bool = _load_env()["SKIP_RESPONSE_CACHE"] == "1"
+    RESPONSE_CACHE_PATH: str = os.path.join(CACHE_DIR, "responses.sqlite3")
+    RESPONSE_CACHE_SIMILARITY: float = 0.95
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    
+    # Recorded tool-call trajectories for the fixed analysis task
+    TRAJECTORY_CACHE_PATH: str = os.path.join(CACHE_DIR, "trajectory_cache.json")
+    
     # MCP Configuration
     MCP_SERVER_NAME: str = "filesystem"
     MCP_ALLOWED_DIRECTORY: str = PROJECT_ROOT
+    MCP_ALLOWED_DIRECTORY_PATH: Path = Path(MCP_ALLOWED_DIRECTORY).resolve()
     
     # Logging Configuration
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = _load_env()["LOG_LEVEL"] or "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
     @classmethod
@@ -59,15 +103,20 @@ class Config:
     @classmethod
     def display(cls) -> None:
         """Display non-sensitive configuration for debugging."""
-        print("\n" + "="*60)
-        print("CONFIGURATION")
-        print("="*60)
-        print(f"Project Root:     {cls.PROJECT_ROOT}")
-        print(f"Documents Dir:    {cls.DOCUMENTS_DIR}")
-        print(f"LLM Model:        {cls.LLM_MODEL}")
-        print(f"LLM Temperature:  {cls.LLM_TEMPERATURE}")
-        print(f"OpenAI API Key:   {'✓ Set' if cls.OPENAI_API_KEY else '✗ Not Set'}")
-        print("="*60 + "\n")
+        # Built as one string so the banner is a single write
+        print("\n".join([
+            "",
+            "="*60,
+            "CONFIGURATION",
+            "="*60,
+            f"Project Root:     {cls.PROJECT_ROOT}",
+            f"Documents Dir:    {cls.DOCUMENTS_DIR}",
+            f"LLM Model:        {cls.LLM_MODEL}",
+            f"LLM Temperature:  {cls.LLM_TEMPERATURE}",
+            f"OpenAI API Key:   {'✓ Set' if cls.OPENAI_API_KEY else '✗ Not Set'}",
+            "="*60,
+            "",
+        ]))
 
 
 def setup_logging(level: str = "INFO") -> None:
@@ -92,28 +141,179 @@ def setup_logging(level: str = "INFO") -> None:
     logging.getLogger("langchain").setLevel(logging.WARNING)
 
 
+def run_async(main):
+    """
+    Run a coroutine to completion, on uvloop when it is available.
+    
+    uvloop is optional and not supported on Windows; without it this is
+    plain asyncio.run().
+    
+    Args:
+        main: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    import asyncio
+    
+    try:
+        if sys.platform == "win32":
+            raise ImportError("uvloop does not support Windows")
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(main)
+
+
+def _http_limits():
+    """Connection pool limits shared by the sync and async HTTP clients."""
+    import httpx
+    
+    return httpx.Limits(
+        max_connections=Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+
+
+@functools.cache
+def get_http_client():
+    """
+    Get the process-wide synchronous HTTP client.
+    
+    Reusing one pooled client keeps TCP/TLS connections to the API alive
+    between requests instead of handshaking for every new LLM client.
+    """
+    import httpx
+    
+    client = httpx.Client(limits=_http_limits(), timeout=Config.HTTP_TIMEOUT)
+    atexit.register(client.close)
+    return client
+
+
+@functools.cache
+def get_http_async_client():
+    """
+    Get the process-wide asynchronous HTTP client.
+    
+    Close it with close_http_clients() before the event loop shuts down.
+    """
+    import httpx
+    
+    return httpx.AsyncClient(limits=_http_limits(), timeout=Config.HTTP_TIMEOUT)
+
+
+async def close_http_clients() -> None:
+    """Close the shared async HTTP client if it was ever created."""
+    if get_http_async_client.cache_info().currsize:
+        await get_http_async_client().aclose()
+        get_http_async_client.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _build_llm(model: str, temperature: float, max_tokens: int, http_async_client):
+    """Construct ChatOpenAI for one settings tuple (see get_llm)."""
+    # Imported lazily: langchain_openai pulls in a heavy dependency tree
+    from langchain_openai import ChatOpenAI
+    
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=Config.OPENAI_API_KEY,
+        max_tokens=max_tokens,
+        http_client=get_http_client(),
+        http_async_client=http_async_client
+    )
+
+
+def get_llm():
+    """
+    Get the shared chat model for the configured LLM settings.
+    
+    The instance is reused across agents and runs; a new one is only built
+    when the model settings (or the shared async HTTP client, after
+    close_http_clients()) change.
+    """
+    return _build_llm(
+        Config.LLM_MODEL,
+        Config.LLM_TEMPERATURE,
+        Config.LLM_MAX_TOKENS,
+        get_http_async_client()
+    )
+
+
+@functools.cache
+def _get_openai_client():
+    """Build the OpenAI client once per process and share it."""
+    from openai import OpenAI
+    
+    return OpenAI(api_key=Config.OPENAI_API_KEY, http_client=get_http_client())
+
+
+def _api_key_fingerprint() -> str:
+    """Hash of the API key, so a stamp is only valid for the key it checked."""
+    return hashlib.sha256((Config.OPENAI_API_KEY or "").encode("utf-8")).hexdigest()
+
+
+def _has_recent_validation() -> bool:
+    """Check for a validation stamp younger than API_VALIDATION_TTL."""
+    try:
+        if time.time() - os.path.getmtime(Config.API_VALIDATION_STAMP) > Config.API_VALIDATION_TTL:
+            return False
+        with open(Config.API_VALIDATION_STAMP, encoding="utf-8") as f:
+            return f.read().strip() == _api_key_fingerprint()
+    except OSError:
+        return False
+
+
+def _record_validation() -> None:
+    """Persist a successful validation; failures to write are not fatal."""
+    try:
+        os.makedirs(os.path.dirname(Config.API_VALIDATION_STAMP), exist_ok=True)
+        with open(Config.API_VALIDATION_STAMP, "w", encoding="utf-8") as f:
+            f.write(_api_key_fingerprint())
+    except OSError as e:
+        logging.getLogger(__name__).debug(f"Could not write validation stamp: {e}")
+
+
+@functools.lru_cache(maxsize=1)
 def validate_api_connection() -> bool:
     """
     Test OpenAI API connectivity.
     
+    The check runs at most once per process (the result is cached), is
+    skipped when SKIP_API_VALIDATION=1, and is skipped when the same API key
+    was validated within API_VALIDATION_TTL seconds (stamp file under
+    ~/.cache/w3d5). Keep it out of agent startup paths.
+    
     Returns:
         True if connection successful, raises exception otherwise
     """
-    from openai import OpenAI
-    
     logger = logging.getLogger(__name__)
     
+    if Config.SKIP_API_VALIDATION:
+        logger.info("Skipping OpenAI API validation (SKIP_API_VALIDATION=1)")
+        return True
+    
+    if _has_recent_validation():
+        logger.info("✓ OpenAI API connection validated recently, skipping check")
+        return True
+    
     try:
-        client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        client = _get_openai_client()
         
         # Simple test: list models (lightweight operation)
         logger.info("Testing OpenAI API connection...")
         models = client.models.list()
         
-        # Verify we got a response
-        model_count = len(list(models.data))
+        # Verify we got a response (count without copying the list;
+        # fall back to iteration if an SDK version yields a generator)
+        data = models.data
+        model_count = len(data) if isinstance(data, list) else sum(1 for _ in data)
         logger.info(f"✓ OpenAI API connection successful ({model_count} models available)")
         
+        _record_validation()
         return True
         
     except Exception as e:
@@ -5,16 +5,23 @@ Creates a ReAct agent with MCP filesystem tools for document analysis.
 """
 
 import sys
-import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_agent
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import SystemMessage
 
-from config import Config, setup_logging
+from config import (
+    Config,
+    setup_logging,
+    get_llm,
+    close_http_clients,
+    run_async,
+)
 from mcp_client import MCPClientManager
+from agent_stream import stream_until_written
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +39,15 @@ IMPORTANT GUIDELINES:
 
 Available tools allow you to:
 - read_file: Read the complete contents of text files
+- read_files: Read several text files at once in a single call
 - list_directory: List all files and directories in a path
 - write_file: Create or overwrite files with new content
+- call_tools: Run several of the above tool calls concurrently in one request
 """
 
+# Wrapped once so agent construction does not rebuild the message
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
 
 class MCPAgent:
     """
@@ -47,7 +59,7 @@ class MCPAgent:
     
     def __init__(self):
         """Initialize the MCP agent."""
-        self.llm: Optional[ChatOpenAI] = None
+        self.llm: Optional["ChatOpenAI"] = None
         self.agent = None
         self.mcp_manager: Optional[MCPClientManager] = None
         self.tools = []
@@ -57,12 +69,7 @@ class MCPAgent:
         
         # Initialize LLM
         logger.info(f"Initializing LLM: {Config.LLM_MODEL}")
-        self.llm = ChatOpenAI(
-            model=Config.LLM_MODEL,
-            temperature=Config.LLM_TEMPERATURE,
-            api_key=Config.OPENAI_API_KEY,
-            max_tokens=Config.LLM_MAX_TOKENS
-        )
+        self.llm = get_llm()
         logger.info("✓ LLM initialized")
         
         # Connect to MCP server
@@ -85,11 +92,13 @@ class MCPAgent:
         """
         logger.info(f"Creating ReAct agent with {len(tools)} tools...")
         
+        from langchain.agents import create_agent
+        
         # Create ReAct agent using LangChain
         agent = create_agent(
             model=self.llm,
             tools=tools,
-            system_prompt=SYSTEM_PROMPT
+            system_prompt=_SYSTEM_MSG
         )
         
         logger.info("✓ Agent created successfully")
@@ -107,37 +116,43 @@ class MCPAgent:
             Dictionary with 'output' and execution metadata
         """
         if not self.agent:
-            raise RuntimeError("Agent not initialized. Call setup() first.")
+            raise RuntimeError("Agent not initialized. Call start() first.")
         
         logger.info(f"Running agent with query: {query[:100]}...")
         
         try:
-            # Run agent
-            final_result = await self.agent.ainvoke(
-                {"messages": [HumanMessage(content=query)]}
-            )
-            
-            # Extract the final message
-            final_message = final_result["messages"][-1].content
+            result = await stream_until_written(self.agent, query)
             
             logger.info("✓ Agent execution completed")
-            return {"output": final_message, "messages": final_result["messages"]}
+            return result
         
         except Exception as e:
             logger.error(f"Agent execution failed: {e}")
             raise
     
-    async def setup(self):
-        """Setup agent with MCP tools (used with async context manager)."""
-        await self.initialize()
+    async def start(self) -> None:
+        """
+        Initialize the agent on a long-lived MCP connection.
         
-        # Connect to MCP and get tools
-        async with self.mcp_manager.connect():
-            self.tools = await self.mcp_manager.get_langchain_tools()
-            self.agent = await self.create_agent(self.tools)
-            
-            # Yield control back to caller
-            yield self
+        The MCP server subprocess is spawned once and reused by every
+        run() until stop() is called.
+        """
+        # Already running: reuse the session, cached tools and agent graph
+        if self.agent is not None and self.mcp_manager.session is not None:
+            return
+        
+        if self.llm is None:
+            await self.initialize()
+        
+        await self.mcp_manager.start()
+        self.tools = await self.mcp_manager.get_langchain_tools()
+        self.agent = await self.create_agent(self.tools)
+    
+    async def stop(self) -> None:
+        """Shut down the MCP connection."""
+        if self.mcp_manager:
+            await self.mcp_manager.stop()
+        self.agent = None
 
 
 async def test_agent():
@@ -156,33 +171,33 @@ async def test_agent():
     logger.info("-"*60)
     
     try:
-        await agent.initialize()
+        await agent.start()
         
-        async with agent.mcp_manager.connect():
-            tools = await agent.mcp_manager.get_langchain_tools()
-            agent.agent = await agent.create_agent(tools)
-            
-            # Run test query
-            print("\n" + "-"*60)
-            result = await agent.run(test_query)
-            
-            logger.info("\n" + "="*60)
-            logger.info("AGENT RESPONSE")
-            logger.info("="*60)
-            logger.info(result.get("output", "No output"))
-            logger.info("="*60)
-            
-            logger.info("\n✓ AGENT TEST PASSED")
-            return True
+        # Run test query
+        print("\n" + "-"*60)
+        result = await agent.run(test_query)
+        
+        logger.info("\n" + "="*60)
+        logger.info("AGENT RESPONSE")
+        logger.info("="*60)
+        logger.info(result.get("output", "No output"))
+        logger.info("="*60)
+        
+        logger.info("\n✓ AGENT TEST PASSED")
+        return True
     
     except Exception as e:
         logger.error(f"\n✗ AGENT TEST FAILED: {e}", exc_info=True)
         return False
+    
+    finally:
+        await agent.stop()
+        await close_http_clients()
 
 
 if __name__ == "__main__":
     setup_logging("INFO")
     
-    success = asyncio.run(test_agent())
+    success = run_async(test_agent())
     
     sys.exit(0 if success else 1)
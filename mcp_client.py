@@ -5,17 +5,16 @@ Connects to MCP filesystem server and converts tools to LangChain format.
 """
 
 import sys
-import asyncio
 import logging
-from typing import List, Optional
-from contextlib import asynccontextmanager
-
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from langchain_mcp_adapters.tools import load_mcp_tools
+from typing import TYPE_CHECKING, List, Optional
+from contextlib import asynccontextmanager, AsyncExitStack
 
 from config import Config
 
+# mcp and langchain-mcp-adapters are imported where used to keep startup light
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,20 +28,31 @@ class MCPClientManager:
     
     def __init__(self):
         """Initialize MCP client manager."""
-        self.session: Optional[ClientSession] = None
+        self.session: Optional["ClientSession"] = None
         self.tools: List = []
         self._cleanup_handlers = []
+        self._exit_stack: Optional[AsyncExitStack] = None
+        # Per-session caches; the server's tool set is fixed for a session
+        self._tools_info: Optional[List[dict]] = None
+        self._lc_tools: Optional[List] = None
     
-    @asynccontextmanager
-    async def connect(self):
+    async def start(self) -> "ClientSession":
         """
-        Connect to MCP server via stdio.
+        Spawn the MCP server and open a long-lived session.
         
-        Usage:
-            async with client_manager.connect() as session:
-                # Use session
-                tools = await session.list_tools()
+        The stdio subprocess stays alive until stop() is called, so many
+        agent runs can share it. Calling start() again while connected
+        returns the existing session.
+        
+        Returns:
+            Initialized MCP client session
         """
+        if self.session:
+            return self.session
+        
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        
         # Configure server parameters
         server_params = StdioServerParameters(
             command=sys.executable,  # Use current Python interpreter
@@ -52,20 +62,60 @@ class MCPClientManager:
         
         logger.info(f"Connecting to MCP server: {server_params.command} {' '.join(server_params.args)}")
         
-        # Create stdio client connection
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                # Initialize session
-                await session.initialize()
-                
-                logger.info("✓ MCP client connected and initialized")
-                self.session = session
-                
-                try:
-                    yield session
-                finally:
-                    self.session = None
-                    logger.info("MCP client disconnected")
+        stack = AsyncExitStack()
+        try:
+            # Create stdio client connection
+            read, write = await stack.enter_async_context(stdio_client(server_params))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            
+            # Initialize session
+            await session.initialize()
+        except BaseException:
+            await stack.aclose()
+            raise
+        
+        logger.info("✓ MCP client connected and initialized")
+        self._exit_stack = stack
+        self.session = session
+        
+        return session
+    
+    async def stop(self) -> None:
+        """Close the MCP session and terminate the server subprocess."""
+        if self._exit_stack is None:
+            return
+        
+        stack, self._exit_stack = self._exit_stack, None
+        self.session = None
+        self._tools_info = None
+        self._lc_tools = None
+        
+        try:
+            await stack.aclose()
+        finally:
+            logger.info("MCP client disconnected")
+    
+    @asynccontextmanager
+    async def connect(self):
+        """
+        Connect to MCP server via stdio.
+        
+        If the manager was already started, the existing session is reused
+        and left open on exit.
+        
+        Usage:
+            async with client_manager.connect() as session:
+                # Use session
+                tools = await session.list_tools()
+        """
+        owns_session = self.session is None
+        session = await self.start()
+        
+        try:
+            yield session
+        finally:
+            if owns_session:
+                await self.stop()
     
     async def list_tools(self) -> List[dict]:
         """
@@ -77,6 +127,9 @@ class MCPClientManager:
         if not self.session:
             raise RuntimeError("Not connected. Use 'async with connect()' first.")
         
+        if self._tools_info is not None:
+            return self._tools_info
+        
         response = await self.session.list_tools()
         
         tools_info = []
@@ -89,6 +142,7 @@ class MCPClientManager:
         
         logger.info(f"Discovered {len(tools_info)} MCP tools")
         
+        self._tools_info = tools_info
         return tools_info
     
     async def get_langchain_tools(self):
@@ -101,17 +155,30 @@ class MCPClientManager:
         if not self.session:
             raise RuntimeError("Not connected. Use 'async with connect()' first.")
         
+        if self._lc_tools is not None:
+            return self._lc_tools
+        
         # Use langchain-mcp-adapters for automatic conversion
+        from langchain_mcp_adapters.tools import load_mcp_tools
+        
         logger.info("Converting MCP tools to LangChain format...")
         
         langchain_tools = await load_mcp_tools(self.session)
         
+        # The adapter raises ToolException for isError=True results; handling
+        # it turns the failure into a ToolMessage with status="error" instead
+        # of aborting the agent run
+        for tool in langchain_tools:
+            tool.handle_tool_error = True
+        
         logger.info(f"✓ Converted {len(langchain_tools)} tools to LangChain format")
         
-        for tool in langchain_tools:
-            logger.info(f"  - {tool.name}: {tool.description}")
+        if logger.isEnabledFor(logging.INFO):
+            for tool in langchain_tools:
+                logger.info("  - %s: %s", tool.name, tool.description)
         
         self.tools = langchain_tools
+        self._lc_tools = langchain_tools
         return langchain_tools
 
 
@@ -175,10 +242,10 @@ async def test_mcp_connection():
 
 
 if __name__ == "__main__":
-    from config import setup_logging
+    from config import setup_logging, run_async
     
     setup_logging("INFO")
     
-    success = asyncio.run(test_mcp_connection())
+    success = run_async(test_mcp_connection())
     
     sys.exit(0 if success else 1)
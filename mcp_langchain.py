@@ -4,13 +4,17 @@ Document Analysis using MCP-Enabled Agent
 This script analyzes business documents using the MCP filesystem agent.
 """
 
+import os
 import sys
 import asyncio
 import logging
-from pathlib import Path
 
-from mcp_agent import MCPAgent
-from config import Config, setup_logging
+from mcp_session import get_shared_agent, close_shared_agent
+from mcp_agent import SYSTEM_PROMPT
+from semantic_cache import SemanticCache
+from trajectory_cache import TrajectoryCache, replay
+from agent_stream import is_successful_write, log_banner, log_response
+from config import Config, setup_logging, close_http_clients, run_async
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +31,7 @@ Please perform the following actions step by step:
 
 1. List all files in the current directory to verify the documents exist.
 
-2. Read each of the three documents completely:
+2. Read the three documents completely in a single read_files call with all three paths:
    - financial_risks.txt
    - marketing_strategy.txt
    - sales_performance.txt
@@ -54,12 +58,20 @@ Begin your analysis now.
 """
 
 
+# Appended to ANALYSIS_TASK when a recorded trajectory was replayed
+REPLAYED_NOTE = """
+NOTE: The list/read steps have already been performed with the filesystem
+tools; their complete outputs are included below. Do not repeat them - start
+directly with step 3 and still save the report with the write_file tool.
+
+CONTEXT:
+"""
+
+
 async def run_document_analysis():
     """Execute document analysis task with MCP agent."""
     
-    logger.info("="*70)
-    logger.info("DOCUMENT ANALYSIS TASK - MCP APPROACH")
-    logger.info("="*70)
+    log_banner(logger, "DOCUMENT ANALYSIS TASK - MCP APPROACH")
     
     # Check document files exist
     doc_files = [
@@ -68,84 +80,151 @@ async def run_document_analysis():
         "sales_performance.txt"
     ]
     
-    missing_files = []
-    for doc in doc_files:
-        if not Path(Config.DOCUMENTS_DIR, doc).exists():
-            missing_files.append(doc)
+    # Stat all documents concurrently in worker threads
+    exists = await asyncio.gather(*(
+        asyncio.to_thread(os.path.exists, Config.DOCUMENTS_DIR_PATH / doc) for doc in doc_files
+    ))
+    missing_files = [doc for doc, found in zip(doc_files, exists) if not found]
     
     if missing_files:
-        logger.error(f"Missing document files: {missing_files}")
+        logger.error("Missing document files: %s", missing_files)
         return False
     
-    logger.info(f"✓ All {len(doc_files)} documents found")
-    logger.info("")
+    logger.info("✓ All %d documents found", len(doc_files))
     
-    # Initialize agent
-    agent = MCPAgent()
+    output_file = Config.DOCUMENTS_DIR_PATH / "consolidated_report.txt"
+    cache = None
     
     try:
+        # Reuse a previous answer if the task, documents and model settings
+        # are unchanged. The cache is only an optimization: any failure
+        # counts as a miss.
+        if Config.SKIP_RESPONSE_CACHE:
+            logger.info("Response cache skipped (SKIP_RESPONSE_CACHE=1)")
+        else:
+            try:
+                cache = SemanticCache()
+                file_hash = SemanticCache.hash_files(
+                    (str(Config.DOCUMENTS_DIR_PATH / doc) for doc in doc_files),
+                    settings=(
+                        Config.LLM_MODEL,
+                        Config.LLM_TEMPERATURE,
+                        Config.LLM_MAX_TOKENS,
+                        SYSTEM_PROMPT,
+                    )
+                )
+                cached = cache.lookup(ANALYSIS_TASK, file_hash)
+                if cached:
+                    output_file.write_text(cached["report"], encoding='utf-8')
+                    logger.info(
+                        "✓ consolidated_report.txt restored from response cache\n"
+                        "  Location: %s",
+                        output_file
+                    )
+                    return True
+            except Exception as e:
+                logger.warning("Response cache unavailable, running analysis: %s", e)
+                if cache is not None:
+                    cache.close()
+                cache = None
+        
+        # Reuse the process-wide agent and its MCP server connection
         logger.info("Initializing MCP Agent...")
-        await agent.initialize()
+        agent = await get_shared_agent()
         
-        logger.info("Connecting to MCP server and loading tools...")
-        async with agent.mcp_manager.connect():
-            tools = await agent.mcp_manager.get_langchain_tools()
-            agent.agent = await agent.create_agent(tools)
-            
-            logger.info("✓ Agent ready")
-            logger.info("")
-            logger.info("="*70)
-            logger.info("STARTING DOCUMENT ANALYSIS")
-            logger.info("="*70)
-            logger.info("")
-            
-            # Run analysis
-            result = await agent.run(ANALYSIS_TASK)
-            
-            logger.info("")
-            logger.info("="*70)
-            logger.info("ANALYSIS COMPLETE")
-            logger.info("="*70)
-            logger.info("")
-            
-            # Display result
-            output = result.get("output", "No output received")
-            logger.info("Agent Response:")
-            logger.info("-"*70)
-            logger.info(output)
-            logger.info("-"*70)
-            
-            # Verify output file was created
-            output_file = Path(Config.DOCUMENTS_DIR, "consolidated_report.txt")
-            if output_file.exists():
-                logger.info("")
-                logger.info("✓ consolidated_report.txt created successfully")
-                logger.info(f"  File size: {output_file.stat().st_size} bytes")
-                logger.info(f"  Location: {output_file}")
-            else:
-                logger.warning("⚠ consolidated_report.txt was not created")
-            
-            logger.info("")
-            logger.info("="*70)
-            logger.info("✓ DOCUMENT ANALYSIS TASK COMPLETED")
-            logger.info("="*70)
+        logger.info("✓ Agent ready")
+        log_banner(logger, "STARTING DOCUMENT ANALYSIS")
+        
+        # Replay recorded list/read steps in-process when the files are
+        # unchanged, leaving only the synthesis step to the LLM
+        trajectories = TrajectoryCache()
+        steps = trajectories.load(ANALYSIS_TASK)
+        # ANALYSIS_TASK always leads the message unchanged, so the provider's
+        # automatic prompt-prefix caching can reuse it; context goes after it
+        query = ANALYSIS_TASK
+        if steps:
+            logger.info("Replaying %d recorded tool calls", len(steps))
+            # Only needed on this path; importing it pulls in the mcp package
+            from mcp_server import FilesystemMCPServer
+            server = FilesystemMCPServer(Config.MCP_ALLOWED_DIRECTORY_PATH)
+            try:
+                query = ANALYSIS_TASK + REPLAYED_NOTE + await replay(steps, server)
+            except Exception as e:
+                logger.warning("Trajectory replay failed, running full analysis: %s", e)
+                trajectories.discard(ANALYSIS_TASK)
+                steps = None
+        
+        # Remember the report's mtime so a stale file is not cached as new
+        report_mtime = output_file.stat().st_mtime_ns if output_file.exists() else None
+        
+        # Run analysis
+        result = await agent.run(query)
+        
+        if not steps:
+            trajectories.save(
+                ANALYSIS_TASK,
+                TrajectoryCache.steps_from_messages(result["messages"])
+            )
+        
+        log_banner(logger, "ANALYSIS COMPLETE")
+        
+        # Display result
+        output = result.get("output", "No output received")
+        log_response(logger, output)
+        
+        # Verify output file was created
+        if output_file.exists():
+            logger.info(
+                "✓ consolidated_report.txt created successfully\n"
+                "  File size: %d bytes\n  Location: %s",
+                output_file.stat().st_size, output_file
+            )
             
-            return True
+            # Cache only a report this run actually wrote: a successful
+            # write_file result, or a file newer than before the run
+            mtime = output_file.stat().st_mtime_ns
+            written = any(is_successful_write(m) for m in result["messages"]) or (
+                report_mtime is None or mtime > report_mtime
+            )
+            if cache is not None and written:
+                try:
+                    cache.store(
+                        ANALYSIS_TASK,
+                        file_hash,
+                        output,
+                        output_file.read_text(encoding='utf-8')
+                    )
+                except Exception as e:
+                    logger.warning("Could not store response in cache: %s", e)
+        else:
+            logger.warning("⚠ consolidated_report.txt was not created")
+        
+        log_banner(logger, "✓ DOCUMENT ANALYSIS TASK COMPLETED")
+        
+        return True
     
     except Exception as e:
-        logger.error(f"✗ Document analysis failed: {e}", exc_info=True)
+        logger.error("✗ Document analysis failed: %s", e, exc_info=True)
         return False
+    
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 async def main():
     """Main entry point."""
     setup_logging("INFO")
     
-    success = await run_document_analysis()
+    try:
+        success = await run_document_analysis()
+    finally:
+        await close_shared_agent()
+        await close_http_clients()
     
     return 0 if success else 1
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = run_async(main())
     sys.exit(exit_code)
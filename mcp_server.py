@@ -6,15 +6,210 @@ All operations are scoped to the allowed directory for security.
 """
 
 import os
+import mmap
+import codecs
+import asyncio
+import inspect
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import aiofiles
+except ImportError:  # optional: read_file falls back to a worker thread
+    aiofiles = None
 from mcp.server import Server
 from mcp.types import Tool, TextContent, Resource, ImageContent
 import mcp.server.stdio
 
 logger = logging.getLogger(__name__)
 
+# Size of the byte pieces read_file reads and decodes at a time
+READ_CHUNK_SIZE = 16 * 1024
+
+# Files at least this large are memory-mapped by read_file
+MMAP_THRESHOLD = 64 * 1024
+
+# Upper bound on tool invocations running at once inside call_tools
+MAX_CONCURRENT_TOOL_CALLS = 8
+
+
+def _resolve_within(allowed_abs: str, file_path: str) -> Optional[str]:
+    """
+    Resolve a path and check it lies within the allowed directory.
+    
+    Resolved on every call (never cached): a file inside the directory can
+    be replaced by a symlink pointing outside it between two tool calls.
+    
+    Args:
+        allowed_abs: Resolved allowed directory
+        file_path: Path to resolve (relative to allowed_abs or absolute)
+        
+    Returns:
+        Resolved absolute path as a string, or None if outside allowed_abs
+    """
+    allowed_dir = Path(allowed_abs)
+    
+    # Convert to absolute path
+    if os.path.isabs(file_path):
+        full_path = Path(file_path).resolve()
+    else:
+        full_path = (allowed_dir / file_path).resolve()
+    
+    # Security check: ensure path is within allowed directory
+    try:
+        full_path.relative_to(allowed_dir)
+    except ValueError:
+        return None
+    
+    return str(full_path)
+
+
+def _read_chunks(file_path: Path, consume: Callable[[bytes], None]) -> None:
+    """
+    Read a file and pass it to consume in READ_CHUNK_SIZE pieces.
+    
+    Blocking; read_file runs it in a worker thread when aiofiles is missing.
+    """
+    with open(file_path, 'rb') as f:
+        while raw := f.read(READ_CHUNK_SIZE):
+            consume(raw)
+
+
+def _read_mapped(file_path: Path, consume: Callable[[bytes], None]) -> None:
+    """
+    Memory-map a file and pass it to consume in READ_CHUNK_SIZE slices.
+    
+    Blocking; read_file runs it in a worker thread.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), READ_CHUNK_SIZE):
+                consume(mm[offset:offset + READ_CHUNK_SIZE])
+    finally:
+        os.close(fd)
+
+
+def _format_entry(entry: os.DirEntry) -> str:
+    """Format one directory entry as a listing row."""
+    # Follow symlinks like Path.is_dir()/is_file(): a link to a directory is
+    # listed as DIR, and a dangling link as a zero-size FILE
+    if entry.is_dir():
+        return f"{'DIR':6} {0:>10} bytes  {entry.name}"
+    size = entry.stat().st_size if entry.is_file() else 0
+    return f"{'FILE':6} {size:>10} bytes  {entry.name}"
+
+
+class BatchError(Exception):
+    """
+    Some entries of a read_files / call_tools batch failed.
+    
+    The message is the full combined result (failed entries carry their
+    Error: text inline), so the client still gets every section while the
+    call as a whole is reported with isError=True.
+    """
+
+
+def _call_name(call: Any) -> str:
+    """Tool name of a call_tools entry, tolerating malformed entries."""
+    name = call.get("name") if isinstance(call, dict) else None
+    return name if isinstance(name, str) else "<invalid>"
+
+
+# Static tool definitions, built once at import and served on every tools/list
+_TOOLS_LIST = (
+    Tool(
+        name="read_file",
+        description="Read the complete contents of a text file. Returns file content as string.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to the file to read (relative or absolute)"
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    Tool(
+        name="read_files",
+        description="Read the complete contents of several text files in one call. Returns all contents, each preceded by a ---FILE: name--- delimiter.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Paths of the files to read (relative or absolute)"
+                }
+            },
+            "required": ["paths"]
+        }
+    ),
+    Tool(
+        name="call_tools",
+        description="Run several filesystem tool calls concurrently in one request. Returns each call's result preceded by a ---CALL n: name--- delimiter.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Tool name (read_file, read_files, list_directory or write_file)"
+                            },
+                            "arguments": {
+                                "type": "object",
+                                "description": "Arguments for the tool"
+                            }
+                        },
+                        "required": ["name", "arguments"]
+                    },
+                    "description": "Tool calls to execute"
+                }
+            },
+            "required": ["calls"]
+        }
+    ),
+    Tool(
+        name="list_directory",
+        description="List all files and directories in a given directory path.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Directory path to list (relative or absolute). Use '.' for current directory."
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    Tool(
+        name="write_file",
+        description="Write content to a file. Creates file if it doesn't exist, overwrites if it does.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path where to write the file"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "Content to write to the file"
+                }
+            },
+            "required": ["path", "content"]
+        }
+    ),
+)
+
 
 class FilesystemMCPServer:
     """
@@ -23,7 +218,7 @@ class FilesystemMCPServer:
     Security: All file operations are validated against allowed_directory.
     """
     
-    def __init__(self, allowed_directory: str):
+    def __init__(self, allowed_directory: Union[str, Path]):
         """
         Initialize filesystem MCP server.
         
@@ -36,8 +231,19 @@ class FilesystemMCPServer:
         # Register tools
         self._register_tools()
         
-        logger.info(f"MCP Filesystem Server initialized")
-        logger.info(f"Allowed directory: {self.allowed_directory}")
+        # Dispatch table for call_tool (tool name -> handler taking kwargs).
+        # Handlers doing real async I/O are coroutines; the rest are plain
+        # functions so they don't pay for a coroutine frame.
+        self._tool_handlers: Dict[str, Callable[..., Any]] = {
+            "read_file": self._read_file,
+            "read_files": self._read_files,
+            "list_directory": self._list_directory,
+            "write_file": self._write_file,
+            "call_tools": self._call_tools,
+        }
+        
+        logger.info("MCP Filesystem Server initialized")
+        logger.info("Allowed directory: %s", self.allowed_directory)
     
     def _validate_path(self, file_path: str) -> Path:
         """
@@ -52,22 +258,15 @@ class FilesystemMCPServer:
         Raises:
             ValueError: If path is outside allowed directory
         """
-        # Convert to absolute path
-        if os.path.isabs(file_path):
-            full_path = Path(file_path).resolve()
-        else:
-            full_path = (self.allowed_directory / file_path).resolve()
+        full_path = _resolve_within(str(self.allowed_directory), file_path)
         
-        # Security check: ensure path is within allowed directory
-        try:
-            full_path.relative_to(self.allowed_directory)
-        except ValueError:
+        if full_path is None:
             raise ValueError(
                 f"Access denied: {file_path} is outside allowed directory "
                 f"{self.allowed_directory}"
             )
         
-        return full_path
+        return Path(full_path)
     
     def _register_tools(self) -> None:
         """Register all filesystem tools with the MCP server."""
@@ -75,72 +274,96 @@ class FilesystemMCPServer:
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
             """List all available filesystem tools."""
-            return [
-                Tool(
-                    name="read_file",
-                    description="Read the complete contents of a text file. Returns file content as string.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "path": {
-                                "type": "string",
-                                "description": "Path to the file to read (relative or absolute)"
-                            }
-                        },
-                        "required": ["path"]
-                    }
-                ),
-                Tool(
-                    name="list_directory",
-                    description="List all files and directories in a given directory path.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "path": {
-                                "type": "string",
-                                "description": "Directory path to list (relative or absolute). Use '.' for current directory."
-                            }
-                        },
-                        "required": ["path"]
-                    }
-                ),
-                Tool(
-                    name="write_file",
-                    description="Write content to a file. Creates file if it doesn't exist, overwrites if it does.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "path": {
-                                "type": "string",
-                                "description": "Path where to write the file"
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "Content to write to the file"
-                            }
-                        },
-                        "required": ["path", "content"]
-                    }
-                ),
-            ]
+            return list(_TOOLS_LIST)
         
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Execute a tool by name with given arguments."""
             
+            # Raising makes the MCP server answer with an isError=True result,
+            # which clients can check instead of parsing the text
             try:
-                if name == "read_file":
-                    return await self._read_file(arguments["path"])
-                elif name == "list_directory":
-                    return await self._list_directory(arguments["path"])
-                elif name == "write_file":
-                    return await self._write_file(arguments["path"], arguments["content"])
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
+                return await self._invoke(name, arguments)
+            
+            except BatchError:
+                logger.error("Tool execution partly failed: %s", name)
+                raise
             
             except Exception as e:
-                logger.error(f"Tool execution failed: {name} - {e}")
-                return [TextContent(type="text", text=f"Error: {str(e)}")]
+                logger.error("Tool execution failed: %s - %s", name, e)
+                raise RuntimeError(f"Error: {str(e)}") from e
+    
+    async def _invoke(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """
+        Look up a tool handler and run it, awaiting it if it is a coroutine.
+        
+        Args:
+            name: Tool name
+            arguments: Keyword arguments for the handler
+            
+        Returns:
+            Handler result
+        """
+        handler = self._tool_handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        result = handler(**arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    async def _call_tools(self, calls: List[Dict[str, Any]]) -> List[TextContent]:
+        """
+        Execute several tool calls concurrently.
+        
+        Args:
+            calls: List of {"name": ..., "arguments": {...}} entries
+            
+        Returns:
+            List containing a single TextContent with every call's result,
+            each preceded by a ---CALL n: name--- delimiter. A failing call
+            reports its error inline without cancelling the others.
+            
+        Raises:
+            BatchError: If any call failed (carrying the same combined text)
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+        failed = False
+        
+        def failure(message: str) -> str:
+            nonlocal failed
+            failed = True
+            return f"Error: {message}"
+        
+        async def run_one(call: Dict[str, Any]) -> str:
+            nonlocal failed
+            # Malformed entries are reported inline like any other failure
+            if not isinstance(call, dict) or not isinstance(call.get("name"), str):
+                return failure("each call needs a string 'name' and an 'arguments' object")
+            name = call["name"]
+            if name == "call_tools":
+                return failure("call_tools cannot be nested")
+            try:
+                async with semaphore:
+                    contents = await self._invoke(name, call.get("arguments") or {})
+                return "".join(content.text for content in contents)
+            except BatchError as e:
+                failed = True
+                return str(e)
+            except Exception as e:
+                logger.error("Tool execution failed: %s - %s", name, e)
+                return failure(str(e))
+        
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run_one(call)) for call in calls]
+        
+        text = "".join(
+            f"\n---CALL {i}: {_call_name(call)}---\n{task.result()}"
+            for i, (call, task) in enumerate(zip(calls, tasks), 1)
+        )
+        if failed:
+            raise BatchError(text)
+        return [TextContent(type="text", text=text)]
     
     async def _read_file(self, path: str) -> List[TextContent]:
         """
@@ -150,7 +373,7 @@ class FilesystemMCPServer:
             path: File path to read
             
         Returns:
-            List containing TextContent with file contents
+            List containing a single TextContent with the file contents
         """
         file_path = self._validate_path(path)
         
@@ -160,17 +383,75 @@ class FilesystemMCPServer:
         if not file_path.is_file():
             raise ValueError(f"Not a file: {path}")
         
+        # Read raw bytes in READ_CHUNK_SIZE pieces and decode them
+        # incrementally, so multi-byte characters split across piece
+        # boundaries stay intact (no text-mode newline translation). Large
+        # files are memory-mapped and sliced instead of copied into Python
+        # buffers by read(). The pieces are joined into one TextContent:
+        # MCP tool results are not streamed, and the LangChain adapter turns
+        # several text parts into a list rather than one string.
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks = []
+        
+        def add_chunk(raw: bytes) -> None:
+            text = decoder.decode(raw)
+            if text:
+                chunks.append(text)
+        
         try:
-            content = file_path.read_text(encoding='utf-8')
-            logger.info(f"Read file: {file_path.name} ({len(content)} chars)")
-            return [TextContent(
-                type="text",
-                text=content
-            )]
+            if file_path.stat().st_size >= MMAP_THRESHOLD:
+                # Mapping and slicing block, so keep them off the event loop
+                await asyncio.to_thread(_read_mapped, file_path, add_chunk)
+            elif aiofiles is None:
+                await asyncio.to_thread(_read_chunks, file_path, add_chunk)
+            else:
+                async with aiofiles.open(file_path, 'rb') as f:
+                    while raw := await f.read(READ_CHUNK_SIZE):
+                        add_chunk(raw)
+            decoder.decode(b'', final=True)
         except UnicodeDecodeError:
             raise ValueError(f"File is not a text file: {path}")
+        
+        text = "".join(chunks)
+        logger.info("Read file: %s (%d chars)", file_path.name, len(text))
+        return [TextContent(type="text", text=text)]
     
-    async def _list_directory(self, path: str) -> List[TextContent]:
+    async def _read_files(self, paths: List[str]) -> List[TextContent]:
+        """
+        Read several files concurrently and return them as one result.
+        
+        Args:
+            paths: File paths to read
+            
+        Returns:
+            List containing a single TextContent with all file contents,
+            each preceded by a ---FILE: name--- delimiter. A file that
+            cannot be read gets its error message in place of contents.
+            
+        Raises:
+            BatchError: If any file could not be read (carrying the same text)
+        """
+        results = await asyncio.gather(
+            *(self._read_file(path) for path in paths),
+            return_exceptions=True
+        )
+        
+        sections = []
+        failed = False
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                body = f"Error: {result}"
+                failed = True
+            else:
+                body = "".join(content.text for content in result)
+            sections.append(f"\n---FILE: {path}---\n{body}")
+        
+        text = "".join(sections)
+        if failed:
+            raise BatchError(text)
+        return [TextContent(type="text", text=text)]
+    
+    def _list_directory(self, path: str) -> List[TextContent]:
         """
         List directory contents.
         
@@ -188,19 +469,17 @@ class FilesystemMCPServer:
         if not dir_path.is_dir():
             raise ValueError(f"Not a directory: {path}")
         
-        # Get all items in directory
-        items = []
-        for item in sorted(dir_path.iterdir()):
-            item_type = "DIR" if item.is_dir() else "FILE"
-            size = item.stat().st_size if item.is_file() else 0
-            items.append(f"{item_type:6} {size:>10} bytes  {item.name}")
+        # Get all items in directory (scandir caches type info per entry)
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
         
-        result = f"Contents of {dir_path}:\n" + "\n".join(items)
-        logger.info(f"Listed directory: {dir_path.name} ({len(items)} items)")
+        body = "\n".join(_format_entry(entry) for entry in entries)
+        result = f"Contents of {dir_path}:\n{body}"
+        logger.info("Listed directory: %s (%d items)", dir_path.name, len(entries))
         
         return [TextContent(type="text", text=result)]
     
-    async def _write_file(self, path: str, content: str) -> List[TextContent]:
+    def _write_file(self, path: str, content: str) -> List[TextContent]:
         """
         Write content to file.
         
@@ -216,10 +495,17 @@ class FilesystemMCPServer:
         # Create parent directories if needed
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write content
-        file_path.write_text(content, encoding='utf-8')
+        # Write content: encode once, then a single raw write on the fd
+        data = content.encode('utf-8')
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         
-        logger.info(f"Wrote file: {file_path.name} ({len(content)} chars)")
+        logger.info("Wrote file: %s (%d chars)", file_path.name, len(content))
         
         return [TextContent(
             type="text",
@@ -250,12 +536,12 @@ async def main():
     )
     
     # Initialize server with allowed directory
-    server = FilesystemMCPServer(Config.MCP_ALLOWED_DIRECTORY)
+    server = FilesystemMCPServer(Config.MCP_ALLOWED_DIRECTORY_PATH)
     
     # Run server
     await server.run()
 
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
+    from config import run_async
+    run_async(main())
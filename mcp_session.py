@@ -0,0 +1,56 @@
+"""
+Shared MCP Agent Session
+
+Keeps one MCPAgent (and its MCP server subprocess) alive for the whole
+process so repeated agent runs do not pay for a subprocess spawn, stdio
+handshake and tool discovery each time.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from mcp_agent import MCPAgent
+
+logger = logging.getLogger(__name__)
+
+_agent: Optional[MCPAgent] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+async def get_shared_agent() -> MCPAgent:
+    """
+    Get the process-wide MCP agent, starting it on first use.
+    
+    The agent is started in the caller's task (not a background task)
+    because the MCP stdio transport must be closed from the task that
+    opened it; call close_shared_agent() from that same task.
+    
+    Returns:
+        Started MCPAgent ready to run queries
+    """
+    global _agent, _lock
+    
+    if _lock is None:
+        _lock = asyncio.Lock()
+    
+    async with _lock:
+        if _agent is None:
+            logger.info("Starting shared MCP agent...")
+            agent = MCPAgent()
+            await agent.start()
+            _agent = agent
+            logger.info("✓ Shared MCP agent ready")
+    
+    return _agent
+
+
+async def close_shared_agent() -> None:
+    """Stop the shared agent and its MCP server subprocess, if started."""
+    global _agent
+    
+    if _agent is None:
+        return
+    
+    agent, _agent = _agent, None
+    await agent.stop()
@@ -1,20 +1,14 @@
 """Quick test of MCP agent."""
-import asyncio
 import logging
-from mcp_agent import MCPAgent
-from config import setup_logging
+from mcp_session import get_shared_agent, close_shared_agent
+from config import setup_logging, close_http_clients, run_async
 
 async def quick_test():
     setup_logging("INFO")
     logger = logging.getLogger(__name__)
     
-    agent = MCPAgent()
-    
-    await agent.initialize()
-    
-    async with agent.mcp_manager.connect():
-        tools = await agent.mcp_manager.get_langchain_tools()
-        agent.agent = await agent.create_agent(tools)
+    try:
+        agent = await get_shared_agent()
         
         # Simple query
         result = await agent.run("What is 2+2?")
@@ -23,5 +17,8 @@ async def quick_test():
         print("RESULT:")
         print(result.get("output", "No output"))
         print("="*60)
+    finally:
+        await close_shared_agent()
+        await close_http_clients()
 
-asyncio.run(quick_test())
+run_async(quick_test())
@@ -0,0 +1,185 @@
+"""
+Semantic Response Cache
+
+Persists agent outputs keyed by prompt and input documents so repeated
+analysis runs can skip the LLM entirely.
+
+Lookups first try an exact match on the prompt hash, then fall back to
+cosine similarity between prompt embeddings (only when the optional
+sentence-transformers package is installed). Entries are always scoped to
+a hash of the input file bytes and the generation settings, so a changed
+document, model or system prompt is never served a stale answer.
+"""
+
+import os
+import math
+import array
+import sqlite3
+import hashlib
+import logging
+import functools
+from typing import Dict, Iterable, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def _get_embedder():
+    """Load the sentence-transformers model once, or None if unavailable."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.info("sentence-transformers not installed; using exact-match cache only")
+        return None
+    
+    return SentenceTransformer(Config.EMBEDDING_MODEL)
+
+
+def _cosine(a: array.array, b: array.array) -> float:
+    """Cosine similarity of two equal-length vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SemanticCache:
+    """
+    SQLite-backed cache of agent outputs.
+    
+    Each row stores the prompt hash, the input file hash, an optional prompt
+    embedding, the agent's final output and the report it wrote.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = Config.RESPONSE_CACHE_PATH,
+        similarity_threshold: float = Config.RESPONSE_CACHE_SIMILARITY
+    ):
+        """
+        Open (and create if needed) the cache database.
+        
+        Args:
+            db_path: SQLite database file
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.similarity_threshold = similarity_threshold
+        
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                prompt_hash TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                embedding BLOB,
+                output TEXT NOT NULL,
+                report TEXT NOT NULL,
+                PRIMARY KEY (prompt_hash, file_hash)
+            )
+            """
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def hash_files(paths: Iterable[str], settings: Iterable[object] = ()) -> str:
+        """
+        Hash the input documents and the settings the answer was produced with.
+        
+        Args:
+            paths: Files whose bytes determine the cached answer
+            settings: Generation settings that also change the answer
+                (e.g. model, temperature, system prompt)
+            
+        Returns:
+            Hex SHA-256 digest over the settings and all file names and contents
+        """
+        digest = hashlib.sha256()
+        for setting in settings:
+            digest.update(repr(setting).encode("utf-8"))
+            digest.update(b"\0")
+        for path in paths:
+            digest.update(os.path.basename(path).encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _hash_prompt(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _embed(prompt: str) -> Optional[array.array]:
+        """Embed a prompt, or None when no embedding model is available."""
+        embedder = _get_embedder()
+        if embedder is None:
+            return None
+        return array.array("f", embedder.encode(prompt).tolist())
+    
+    def lookup(self, prompt: str, file_hash: str) -> Optional[Dict[str, str]]:
+        """
+        Find a cached response for a prompt over the given documents.
+        
+        Args:
+            prompt: Task prompt sent to the agent
+            file_hash: Hash of the input documents (see hash_files)
+            
+        Returns:
+            Dictionary with 'output' and 'report', or None on a miss
+        """
+        row = self.conn.execute(
+            "SELECT output, report FROM responses WHERE prompt_hash = ? AND file_hash = ?",
+            (self._hash_prompt(prompt), file_hash)
+        ).fetchone()
+        if row:
+            logger.info("Response cache hit (exact match)")
+            return {"output": row[0], "report": row[1]}
+        
+        query = self._embed(prompt)
+        if query is None:
+            return None
+        
+        best, best_score = None, self.similarity_threshold
+        rows = self.conn.execute(
+            "SELECT embedding, output, report FROM responses "
+            "WHERE file_hash = ? AND embedding IS NOT NULL",
+            (file_hash,)
+        )
+        for blob, output, report in rows:
+            candidate = array.array("f")
+            candidate.frombytes(blob)
+            score = _cosine(query, candidate)
+            if score >= best_score:
+                best, best_score = {"output": output, "report": report}, score
+        
+        if best:
+            logger.info("Response cache hit (similarity %.3f)", best_score)
+        return best
+    
+    def store(self, prompt: str, file_hash: str, output: str, report: str) -> None:
+        """
+        Save an agent response.
+        
+        Args:
+            prompt: Task prompt sent to the agent
+            file_hash: Hash of the input documents (see hash_files)
+            output: Agent's final message
+            report: Contents of the report file the agent wrote
+        """
+        embedding = self._embed(prompt)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (
+                self._hash_prompt(prompt),
+                file_hash,
+                embedding.tobytes() if embedding is not None else None,
+                output,
+                report,
+            )
+        )
+        self.conn.commit()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
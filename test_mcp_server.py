@@ -5,11 +5,10 @@ Tests tool registration and basic functionality without running the full server.
 """
 
 import sys
-import asyncio
+import time
 import logging
-from pathlib import Path
-from config import Config, setup_logging
-from mcp_server import FilesystemMCPServer
+from config import Config, setup_logging, run_async
+from mcp_server import FilesystemMCPServer, BatchError, READ_CHUNK_SIZE, MMAP_THRESHOLD
 
 async def test_mcp_server():
     """Test MCP server initialization and tool registration."""
@@ -19,7 +18,7 @@ async def test_mcp_server():
     
     # Initialize server
     try:
-        server = FilesystemMCPServer(Config.MCP_ALLOWED_DIRECTORY)
+        server = FilesystemMCPServer(Config.MCP_ALLOWED_DIRECTORY_PATH)
         logger.info("✓ Server initialized successfully")
     except Exception as e:
         logger.error(f"✗ Server initialization failed: {e}")
@@ -31,9 +30,9 @@ async def test_mcp_server():
         test_path = server._validate_path("financial_risks.txt")
         logger.info(f"✓ Path validation working: {test_path.name}")
         
-        # Invalid path (outside allowed directory)
+        # Invalid path (outside allowed directory, absolute on every platform)
         try:
-            server._validate_path("C:\\Windows\\System32\\test.txt")
+            server._validate_path(str(Config.MCP_ALLOWED_DIRECTORY_PATH.parent / "x"))
             logger.error("✗ Security check failed - allowed access outside directory")
             return False
         except ValueError:
@@ -46,13 +45,13 @@ async def test_mcp_server():
     # Test tool methods (direct invocation)
     try:
         # Test list_directory
-        result = await server._list_directory(".")
+        result = server._list_directory(".")
         logger.info(f"✓ list_directory working: {len(result)} result(s)")
         
         # Test read_file (on an existing file)
         test_files = ["financial_risks.txt", "marketing_strategy.txt", "sales_performance.txt"]
         for test_file in test_files:
-            if Path(Config.DOCUMENTS_DIR, test_file).exists():
+            if (Config.DOCUMENTS_DIR_PATH / test_file).exists():
                 result = await server._read_file(test_file)
                 logger.info(f"✓ read_file working: read {test_file}")
                 break
@@ -60,12 +59,12 @@ async def test_mcp_server():
             logger.warning("⚠ No test documents found for read_file test")
         
         # Test write_file
-        test_content = "MCP Server Test - " + str(asyncio.get_event_loop().time())
-        result = await server._write_file("mcp_test_output.txt", test_content)
+        test_content = "MCP Server Test - " + str(time.monotonic_ns())
+        result = server._write_file("mcp_test_output.txt", test_content)
         logger.info(f"✓ write_file working: wrote test file")
         
         # Verify file was written
-        test_file_path = Path(Config.DOCUMENTS_DIR, "mcp_test_output.txt")
+        test_file_path = Config.DOCUMENTS_DIR_PATH / "mcp_test_output.txt"
         if test_file_path.exists():
             content = test_file_path.read_text()
             if content == test_content:
@@ -74,6 +73,78 @@ async def test_mcp_server():
                 logger.error("✗ File content mismatch")
                 return False
         
+        # Test read_files (one readable file, one missing file): the partial
+        # failure is raised (isError=True) with every section in its text
+        try:
+            await server._read_files(["mcp_test_output.txt", "missing_file.txt"])
+            text = ""
+        except BatchError as e:
+            text = str(e)
+        if (f"---FILE: mcp_test_output.txt---\n{test_content}" in text
+                and "---FILE: missing_file.txt---\nError: " in text):
+            logger.info("✓ read_files working: per-file error reported inline")
+        else:
+            logger.error("✗ read_files result mismatch")
+            return False
+        
+        # Test call_tools (a malformed entry must not cancel the valid call)
+        try:
+            await server._call_tools([
+                {"name": "read_file", "arguments": {"path": "mcp_test_output.txt"}},
+                "not a call",
+            ])
+            text = ""
+        except BatchError as e:
+            text = str(e)
+        if (f"---CALL 1: read_file---\n{test_content}" in text
+                and "---CALL 2: <invalid>---\nError: " in text):
+            logger.info("✓ call_tools working: malformed entry reported inline")
+        else:
+            logger.error("✗ call_tools result mismatch")
+            return False
+        
+        # Test that a path read once is re-checked: swapping the file for a
+        # symlink that points outside the allowed directory must be rejected
+        outside = server.allowed_directory.parent / "mcp_test_outside.txt"
+        swapped = server.allowed_directory / "mcp_test_swap.txt"
+        outside.write_text("outside", encoding="utf-8")
+        try:
+            server._write_file(swapped.name, "inside")
+            await server._read_file(swapped.name)
+            swapped.unlink()
+            try:
+                swapped.symlink_to(outside)
+            except OSError:
+                logger.warning("⚠ Symlinks unavailable, skipping symlink swap test")
+            else:
+                try:
+                    server._write_file(swapped.name, "escaped")
+                    logger.error("✗ Security check failed - write followed swapped symlink")
+                    return False
+                except ValueError:
+                    logger.info("✓ Security check passed - swapped symlink rejected")
+        finally:
+            swapped.unlink(missing_ok=True)
+            outside.unlink(missing_ok=True)
+        
+        # Test multi-chunk reads where a 2-byte UTF-8 character straddles
+        # every chunk boundary (plain read path and memory-mapped path)
+        for name, repeat in (
+            ("mcp_test_utf8.txt", READ_CHUNK_SIZE),
+            ("mcp_test_utf8_mmap.txt", MMAP_THRESHOLD),
+        ):
+            utf8_content = "x" + "é" * repeat
+            server._write_file(name, utf8_content)
+            try:
+                result = await server._read_file(name)
+            finally:
+                (server.allowed_directory / name).unlink()
+            if len(result) == 1 and result[0].text == utf8_content:
+                logger.info(f"✓ read_file working: multi-chunk UTF-8 read of {name}")
+            else:
+                logger.error(f"✗ read_file UTF-8 chunk boundary mismatch: {name}")
+                return False
+        
     except Exception as e:
         logger.error(f"✗ Tool method test failed: {e}")
         return False
@@ -87,6 +158,6 @@ async def test_mcp_server():
 if __name__ == "__main__":
     setup_logging("INFO")
     
-    success = asyncio.run(test_mcp_server())
+    success = run_async(test_mcp_server())
     
     sys.exit(0 if success else 1)
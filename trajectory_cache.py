@@ -0,0 +1,199 @@
+"""
+Tool Trajectory Cache
+
+Records the read-only tool calls (list_directory / read_file(s)) the agent
+made for a fixed task and replays them directly against the MCP server
+on later runs, so the agent only has to do the synthesis step.
+
+A trajectory is reused only while the files it read are unchanged
+(same modification time and size).
+"""
+
+import os
+import json
+import inspect
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from agent_stream import content_text
+
+logger = logging.getLogger(__name__)
+
+# Tools that only observe the filesystem and are therefore safe to replay
+REPLAYABLE_TOOLS = ("list_directory", "read_file", "read_files")
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    """Modification time and size of a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class TrajectoryCache:
+    """
+    JSON-file cache of tool-call trajectories keyed by task hash.
+    
+    Entry layout:
+        {"steps": [{"tool": ..., "args": {...}}, ...],
+         "files": {"<absolute path>": [mtime_ns, size], ...}}
+    """
+    
+    def __init__(self, cache_path: str = Config.TRAJECTORY_CACHE_PATH):
+        """
+        Load the cache file (a missing or corrupt file starts empty).
+        
+        Args:
+            cache_path: JSON file holding all trajectories
+        """
+        self.cache_path = cache_path
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                self._entries: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+    
+    @staticmethod
+    def _key(task: str) -> str:
+        return hashlib.sha256(task.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _resolve(path: str) -> str:
+        return str(Config.DOCUMENTS_DIR_PATH / path)
+    
+    @staticmethod
+    def steps_from_messages(messages) -> List[Dict[str, Any]]:
+        """
+        Extract the replayable tool calls from an agent conversation.
+        
+        Only calls whose ToolMessage does not have status="error" are
+        kept, so a misspelled or rejected path is never recorded.
+        
+        Args:
+            messages: Messages returned by the agent run
+            
+        Returns:
+            Ordered list of {"tool": name, "args": arguments}
+        """
+        succeeded = {
+            message.tool_call_id
+            for message in messages
+            if getattr(message, "tool_call_id", None)
+            and getattr(message, "status", "success") != "error"
+        }
+        
+        steps = []
+        for message in messages:
+            for call in getattr(message, "tool_calls", None) or []:
+                if call["name"] in REPLAYABLE_TOOLS and call.get("id") in succeeded:
+                    steps.append({"tool": call["name"], "args": call["args"]})
+        return steps
+    
+    def load(self, task: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the recorded trajectory for a task if its inputs are unchanged.
+        
+        Args:
+            task: Task prompt the trajectory was recorded for
+            
+        Returns:
+            List of steps, or None if missing or stale
+        """
+        entry = self._entries.get(self._key(task))
+        if not entry:
+            return None
+        
+        for path, signature in entry["files"].items():
+            if signature is None or _file_signature(path) != signature:
+                logger.info("Trajectory cache stale: %s changed", os.path.basename(path))
+                return None
+        
+        return entry["steps"]
+    
+    def save(self, task: str, steps: List[Dict[str, Any]]) -> None:
+        """
+        Record a trajectory together with signatures of the files it read.
+        
+        Args:
+            task: Task prompt the trajectory belongs to
+            steps: Replayable steps (see steps_from_messages)
+        """
+        if not steps:
+            return
+        
+        files = {}
+        for step in steps:
+            if step["tool"] == "read_file":
+                read_paths = [step["args"]["path"]]
+            elif step["tool"] == "read_files":
+                read_paths = step["args"]["paths"]
+            else:
+                continue
+            for read_path in read_paths:
+                path = self._resolve(read_path)
+                signature = _file_signature(path)
+                if signature is None:
+                    logger.info("Not saving trajectory: %s is missing", read_path)
+                    return
+                files[path] = signature
+        
+        self._entries[self._key(task)] = {"steps": steps, "files": files}
+        self._write()
+    
+    def discard(self, task: str) -> None:
+        """
+        Drop the trajectory recorded for a task (e.g. after a failed replay).
+        
+        Args:
+            task: Task prompt the trajectory belongs to
+        """
+        if self._entries.pop(self._key(task), None) is not None:
+            self._write()
+    
+    def _write(self) -> None:
+        """Persist all entries; failures only cost future cache hits."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+            logger.info("Saved trajectory cache (%d entries)", len(self._entries))
+        except OSError as e:
+            logger.warning("Could not save trajectory cache: %s", e)
+
+
+async def replay(steps: List[Dict[str, Any]], server) -> str:
+    """
+    Re-run recorded read-only steps directly against the MCP server.
+    
+    Args:
+        steps: Recorded trajectory
+        server: FilesystemMCPServer instance (called in-process, no stdio)
+        
+    Returns:
+        Tool outputs concatenated into one context block
+        
+    Raises:
+        Exception: Whatever a failing step raises (the server's tool
+            handlers raise on any error, including a partly failed
+            read_files); callers should fall back to a normal agent run
+    """
+    handlers = {
+        "list_directory": server._list_directory,
+        "read_file": server._read_file,
+        "read_files": server._read_files,
+    }
+    
+    sections = []
+    for step in steps:
+        contents = handlers[step["tool"]](**step["args"])
+        if inspect.isawaitable(contents):
+            contents = await contents
+        text = content_text(contents)
+        target = step["args"].get("path") or ", ".join(step["args"].get("paths", []))
+        sections.append(f"<{step['tool']} {target}>\n{text}\n</{step['tool']}>")
+    
+    return "\n".join(sections)